@@ -0,0 +1,111 @@
+# cython: language_level=3
+# -*- coding: utf-8 -*-
+
+"""
+Varianta Cython a kernel-ului _indicators_fused din tv_style_alpaca_flip.py,
+pentru medii fără Numba/LLVM. Se compilează cu: python setup.py build_ext --inplace
+Aceeași semnătură: vectorul de stare (15 valori) e actualizat pe loc,
+iar rezultatele se scriu în out[0..4, :n] (EMA, RSI, MACD, SIG, ADX).
+"""
+
+cimport cython
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cpdef void fused_indicators(double[::1] open_, double[::1] high, double[::1] low, double[::1] close,
+                            double[::1] st, double[:, ::1] out,
+                            long ema_len=50, long rsi_len=14, long adx_len=14):
+    cdef Py_ssize_t i, n = close.shape[0]
+
+    cdef double a_ema = 2.0 / (ema_len + 1)
+    cdef double a_fast = 2.0 / (12 + 1)
+    cdef double a_slow = 2.0 / (26 + 1)
+    cdef double a_sig = 2.0 / (9 + 1)
+    cdef double a_rsi = 1.0 / rsi_len
+    cdef double a_adx = 1.0 / adx_len
+
+    cdef double nb = st[0]
+    cdef double ema_s = st[1], fast_s = st[2], slow_s = st[3], sig_s = st[4]
+    cdef double up_s = st[5], dn_s = st[6]
+    cdef double tr_s = st[7], p_dm_s = st[8], m_dm_s = st[9], adx_s = st[10]
+    cdef bint adx_ok = st[11] > 0.0
+    cdef double ph = st[12], pl = st[13], pc = st[14]
+    cdef double h, l, c, m, delta, up, dn, r, tr, hu, ld, p_dm, m_dm, p_di, m_di, dx
+
+    for i in range(n):
+        h = high[i]
+        l = low[i]
+        c = close[i]
+
+        if nb == 0:
+            ema_s = c
+            fast_s = c
+            slow_s = c
+            sig_s = 0.0
+            tr_s = h - l
+            out[0, i] = ema_s
+            out[1, i] = 50.0
+            out[2, i] = 0.0
+            out[3, i] = 0.0
+            out[4, i] = 0.0
+            ph, pl, pc = h, l, c
+            nb += 1
+            continue
+
+        # EMA + MACD
+        ema_s = a_ema * c + (1.0 - a_ema) * ema_s
+        fast_s = a_fast * c + (1.0 - a_fast) * fast_s
+        slow_s = a_slow * c + (1.0 - a_slow) * slow_s
+        m = fast_s - slow_s
+        sig_s = a_sig * m + (1.0 - a_sig) * sig_s
+
+        # RSI (prima diferență inițializează media)
+        delta = c - pc
+        up = delta if delta > 0.0 else 0.0
+        dn = -delta if delta < 0.0 else 0.0
+        if nb == 1:
+            up_s = up
+            dn_s = dn
+        else:
+            up_s = a_rsi * up + (1.0 - a_rsi) * up_s
+            dn_s = a_rsi * dn + (1.0 - a_rsi) * dn_s
+        if dn_s > 0.0:
+            r = 100.0 - 100.0 / (1.0 + up_s / dn_s)
+        elif up_s > 0.0:
+            r = 100.0
+        else:
+            r = 50.0
+
+        # ADX
+        tr = max(h - l, abs(h - pc), abs(l - pc))
+        hu = h - ph
+        ld = pl - l
+        p_dm = hu if (hu > ld and hu > 0.0) else 0.0
+        m_dm = ld if (ld > hu and ld > 0.0) else 0.0
+        tr_s = a_adx * tr + (1.0 - a_adx) * tr_s
+        p_dm_s = a_adx * p_dm + (1.0 - a_adx) * p_dm_s
+        m_dm_s = a_adx * m_dm + (1.0 - a_adx) * m_dm_s
+        if tr_s > 0.0:
+            p_di = 100.0 * p_dm_s / tr_s
+            m_di = 100.0 * m_dm_s / tr_s
+            if p_di + m_di > 0.0:
+                dx = 100.0 * abs(p_di - m_di) / (p_di + m_di)
+                adx_s = a_adx * dx + (1.0 - a_adx) * adx_s if adx_ok else dx
+                adx_ok = True
+
+        out[0, i] = ema_s
+        out[1, i] = r
+        out[2, i] = m
+        out[3, i] = sig_s
+        out[4, i] = adx_s
+        ph, pl, pc = h, l, c
+        nb += 1
+
+    st[0] = nb
+    st[1], st[2], st[3], st[4] = ema_s, fast_s, slow_s, sig_s
+    st[5], st[6] = up_s, dn_s
+    st[7], st[8], st[9], st[10] = tr_s, p_dm_s, m_dm_s, adx_s
+    st[11] = 1.0 if adx_ok else 0.0
+    st[12], st[13], st[14] = ph, pl, pc
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PRELOAD - încălzește kernel-urile Numba înainte de prima rulare.
+Importul modulului compilează (sau încarcă din cache) kernel-urile cu
+semnătură explicită, astfel încât run_once nu mai plătește costul JIT.
+"""
+
+import time
+
+t0 = time.perf_counter()
+import tv_style_alpaca_flip  # noqa: E402,F401
+
+print(f"✅ Kernel-uri pregătite în {time.perf_counter() - t0:.2f}s")
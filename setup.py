@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Extensia Cython opțională pentru indicatori (alternativă la Numba):
+    pip install cython
+    python setup.py build_ext --inplace
+tv_style_alpaca_flip.py o folosește automat dacă _indicators se poate importa.
+"""
+
+import os
+
+from setuptools import Extension, setup
+from Cython.Build import cythonize
+
+extra = [] if os.name == "nt" else ["-O3", "-march=native", "-ffast-math"]
+
+setup(
+    name="alpaca-bot-indicators",
+    ext_modules=cythonize(
+        [Extension("_indicators", ["_indicators.pyx"], extra_compile_args=extra)],
+        language_level=3,
+    ),
+)
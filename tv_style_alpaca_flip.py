@@ -9,9 +9,9 @@ Feature Nou: Verificare "Lag" (Întârziere date)
 
 import os
 import time
-import json
 import argparse
 import datetime as dt
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Optional, Literal, Tuple
@@ -20,6 +20,28 @@ import numpy as np
 import pandas as pd
 import requests
 import yfinance as yf
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import msgpack
+except ImportError:  # Fără msgpack: barele Alpaca vin ca JSON
+    msgpack = None
+
+try:
+    from orjson import dumps as json_dumps
+except ImportError:  # Fără orjson: json din biblioteca standard
+    import json
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+try:
+    from numba import njit
+except ImportError:  # Fără numba: kernel-urile rulează ca Python pur
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda f: f
 
 # ============================================================
 #                    1. CONFIGURARE
@@ -28,60 +50,261 @@ import yfinance as yf
 ALPACA_API_KEY = os.environ.get("ALPACA_API_KEY") or os.environ.get("APCA_API_KEY_ID")
 ALPACA_API_SECRET = os.environ.get("ALPACA_API_SECRET") or os.environ.get("APCA_API_SECRET_KEY")
 ALPACA_BASE_URL = (os.environ.get("ALPACA_BASE_URL") or "https://paper-api.alpaca.markets").rstrip("/")
+ALPACA_DATA_URL = (os.environ.get("ALPACA_DATA_URL") or "https://data.alpaca.markets").rstrip("/")
+ALPACA_FEED = os.environ.get("ALPACA_FEED") or "iex"
 
 TELEGRAM_TOKEN = os.environ.get("TELEGRAM_TOKEN")
 TELEGRAM_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 
+# URL-uri și header-e construite o singură dată, la import
+POSITIONS_URL = f"{ALPACA_BASE_URL}/v2/positions/"
+ORDERS_URL = f"{ALPACA_BASE_URL}/v2/orders"
+BARS_URL = f"{ALPACA_DATA_URL}/v2/stocks/{{}}/bars"
+TELEGRAM_URL = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
+JSON_HEADERS = {"Content-Type": "application/json"}
+BARS_HEADERS = {"Accept": "application/msgpack"} if msgpack else None
+
 DEFAULT_SYMBOL = "GME"
+BAR_MINUTES = 15
+MIN_BARS = 50  # bare minime la pornirea la rece (încălzire EMA50)
 
 # ============================================================
 #                    2. UTILITARE
 # ============================================================
 
+def http_session() -> requests.Session:
+    """
+    Sesiune HTTP keep-alive cu pool de conexiuni și retry cu backoff.
+    POST nu e reîncercat (urllib3 implicit), ca să nu dublăm ordinele.
+    """
+    s = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    s.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=retry))
+    s.headers["Connection"] = "keep-alive"
+    return s
+
+_tg_session = http_session()
+
 def tg_send(text: str) -> None:
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID: return
     try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-        requests.post(url, json={"chat_id": TELEGRAM_CHAT_ID, "text": text}, timeout=10)
+        _tg_session.post(TELEGRAM_URL, data=json_dumps({"chat_id": TELEGRAM_CHAT_ID, "text": text}),
+                         headers=JSON_HEADERS, timeout=10)
     except Exception as e:
         print(f"TG Error: {e}")
 
+# Notificările nu blochează ordinele; la ieșire Python așteaptă mesajele în curs.
+_tg_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tg")
+
+def tg_notify(text: str) -> None:
+    """Trimite mesajul Telegram în fundal (fire-and-forget)."""
+    _tg_pool.submit(tg_send, text)
+
 # ============================================================
 #                    3. INDICATORI
 # ============================================================
 
+@njit(cache=True)
+def _ewm_loop(x, alpha):
+    """Echivalent cu ewm(alpha=alpha, adjust=False).mean() pe un array fără NaN."""
+    n = x.shape[0]
+    out = np.empty(n)
+    if n == 0:
+        return out
+    out[0] = x[0]
+    for i in range(1, n):
+        out[i] = alpha * x[i] + (1.0 - alpha) * out[i-1]
+    return out
+
 def ema(series: pd.Series, length: int) -> pd.Series:
-    return series.ewm(span=length, adjust=False).mean()
+    x = series.to_numpy(np.float64, copy=True)
+    return pd.Series(_ewm_loop(x, 2.0 / (length + 1)), index=series.index)
 
 def rsi(close: pd.Series, length: int = 14) -> pd.Series:
-    delta = close.diff()
-    up = delta.clip(lower=0.0); down = (-delta).clip(lower=0.0)
-    rs = up.ewm(alpha=1/length, adjust=False).mean() / down.ewm(alpha=1/length, adjust=False).mean()
-    return 100.0 - (100.0 / (1.0 + rs)).fillna(50.0)
+    c = close.to_numpy(np.float64, copy=True)
+    out = np.full(len(c), 50.0)
+    if len(c) > 1:
+        delta = np.diff(c)
+        up = _ewm_loop(np.clip(delta, 0.0, None), 1.0 / length)
+        down = _ewm_loop(np.clip(-delta, 0.0, None), 1.0 / length)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            out[1:] = np.where(up + down > 0.0, 100.0 * up / (up + down), 50.0)
+    return pd.Series(out, index=close.index)
 
 def macd(close: pd.Series) -> Tuple[pd.Series, pd.Series]:
-    fast = close.ewm(span=12, adjust=False).mean()
-    slow = close.ewm(span=26, adjust=False).mean()
-    macd_line = fast - slow
-    signal = macd_line.ewm(span=9, adjust=False).mean()
+    macd_line = ema(close, 12) - ema(close, 26)
+    signal = ema(macd_line, 9)
     return macd_line, signal
 
+@njit(cache=True, fastmath=True)
+def _adx_loop(high, low, close, length):
+    """
+    ADX Wilder într-o singură trecere: TR, +DM, -DM și cele 4 EWM-uri
+    sunt ținute ca scalari (echivalent cu ewm(alpha=1/length, adjust=False)).
+    """
+    n = close.shape[0]
+    out = np.zeros(n)
+    if n == 0:
+        return out
+    alpha = 1.0 / length
+    tr_s = high[0] - low[0]
+    p_dm_s = 0.0
+    m_dm_s = 0.0
+    adx_s = 0.0
+    adx_ok = False  # DX e nedefinit (0/0) până apare prima mișcare direcțională
+    for i in range(1, n):
+        tr = max(high[i] - low[i], abs(high[i] - close[i-1]), abs(low[i] - close[i-1]))
+        up = high[i] - high[i-1]
+        down = low[i-1] - low[i]
+        p_dm = up if (up > down and up > 0.0) else 0.0
+        m_dm = down if (down > up and down > 0.0) else 0.0
+
+        tr_s = alpha * tr + (1.0 - alpha) * tr_s
+        p_dm_s = alpha * p_dm + (1.0 - alpha) * p_dm_s
+        m_dm_s = alpha * m_dm + (1.0 - alpha) * m_dm_s
+
+        if tr_s > 0.0:
+            p_di = 100.0 * p_dm_s / tr_s
+            m_di = 100.0 * m_dm_s / tr_s
+            if p_di + m_di > 0.0:
+                dx = 100.0 * abs(p_di - m_di) / (p_di + m_di)
+                adx_s = alpha * dx + (1.0 - alpha) * adx_s if adx_ok else dx
+                adx_ok = True
+        out[i] = adx_s
+    return out
+
 def adx(high, low, close, length=14):
-    tr = pd.concat([(high-low), (high-close.shift(1)).abs(), (low-close.shift(1)).abs()], axis=1).max(axis=1)
-    up, down = high-high.shift(1), low.shift(1)-low
-    
-    # Conversie explicită pentru siguranță
-    p_dm_val = np.where((up>down)&(up>0), up, 0.0)
-    m_dm_val = np.where((down>up)&(down>0), down, 0.0)
-    
-    p_dm = pd.Series(p_dm_val, index=close.index)
-    m_dm = pd.Series(m_dm_val, index=close.index)
-    
-    tr_s = tr.ewm(alpha=1/length, adjust=False).mean()
-    p_di = 100 * (p_dm.ewm(alpha=1/length, adjust=False).mean() / tr_s)
-    m_di = 100 * (m_dm.ewm(alpha=1/length, adjust=False).mean() / tr_s)
-    dx = 100 * abs(p_di - m_di) / (p_di + m_di)
-    return dx.ewm(alpha=1/length, adjust=False).mean().fillna(0.0)
+    h = high.to_numpy(np.float64, copy=True)
+    l = low.to_numpy(np.float64, copy=True)
+    c = close.to_numpy(np.float64, copy=True)
+    return pd.Series(_adx_loop(h, l, c, length), index=close.index)
+
+# Starea recurențelor după ultima bară procesată (persistată în ind_state.txt)
+_ST_N, _ST_EMA, _ST_FAST, _ST_SLOW, _ST_SIG, _ST_UP, _ST_DN, \
+    _ST_TR, _ST_PDM, _ST_MDM, _ST_ADX, _ST_ADX_OK, _ST_H, _ST_L, _ST_C = range(15)
+_ST_LEN = 15
+
+def _new_state() -> np.ndarray:
+    return np.zeros(_ST_LEN)
+
+# Rândurile buffer-ului de ieșire al kernel-ului
+_OUT_EMA, _OUT_RSI, _OUT_MACD, _OUT_SIG, _OUT_ADX = range(5)
+
+# Extensia Cython (setup.py build_ext --inplace) are prioritate: dacă se poate
+# importa, kernel-ul Numba nu mai e definit (deci nici compilat). Fără niciuna,
+# kernel-ul de mai jos rulează ca Python pur.
+try:
+    from _indicators import fused_indicators as _indicators_fused
+except ImportError:
+    @njit("void(float64[:], float64[:], float64[:], float64[:], float64[:], float64[:, ::1], int64, int64, int64)",
+          cache=True, fastmath=True)
+    def _indicators_fused(open_, high, low, close, st, out, ema_len=50, rsi_len=14, adx_len=14):
+        """
+        EMA, RSI, MACD(12,26,9) și ADX într-o singură trecere peste OHLC.
+        Aceleași recurențe ca ema()/rsi()/macd()/adx(), pornind de la starea `st`
+        (zero = pornire la rece), care este actualizată pe loc.
+        Rezultatele se scriu în out[_OUT_*, :n] (buffer prealocat, vezi indicator_buffer).
+        """
+        n = close.shape[0]
+
+        a_ema = 2.0 / (ema_len + 1)
+        a_fast = 2.0 / (12 + 1)
+        a_slow = 2.0 / (26 + 1)
+        a_sig = 2.0 / (9 + 1)
+        a_rsi = 1.0 / rsi_len
+        a_adx = 1.0 / adx_len
+
+        nb = st[_ST_N]
+        ema_s, fast_s, slow_s, sig_s = st[_ST_EMA], st[_ST_FAST], st[_ST_SLOW], st[_ST_SIG]
+        up_s, dn_s = st[_ST_UP], st[_ST_DN]
+        tr_s, p_dm_s, m_dm_s, adx_s = st[_ST_TR], st[_ST_PDM], st[_ST_MDM], st[_ST_ADX]
+        adx_ok = st[_ST_ADX_OK] > 0.0
+        ph, pl, pc = st[_ST_H], st[_ST_L], st[_ST_C]
+
+        for i in range(n):
+            h = high[i]
+            l = low[i]
+            c = close[i]
+
+            if nb == 0:
+                ema_s = fast_s = slow_s = c
+                sig_s = 0.0
+                tr_s = h - l
+                out[_OUT_EMA, i] = ema_s
+                out[_OUT_RSI, i] = 50.0
+                out[_OUT_MACD, i] = 0.0
+                out[_OUT_SIG, i] = 0.0
+                out[_OUT_ADX, i] = 0.0
+                ph, pl, pc = h, l, c
+                nb += 1
+                continue
+
+            # EMA + MACD
+            ema_s = a_ema * c + (1.0 - a_ema) * ema_s
+            fast_s = a_fast * c + (1.0 - a_fast) * fast_s
+            slow_s = a_slow * c + (1.0 - a_slow) * slow_s
+            m = fast_s - slow_s
+            sig_s = a_sig * m + (1.0 - a_sig) * sig_s
+
+            # RSI (prima diferență inițializează media)
+            delta = c - pc
+            up = delta if delta > 0.0 else 0.0
+            dn = -delta if delta < 0.0 else 0.0
+            if nb == 1:
+                up_s = up
+                dn_s = dn
+            else:
+                up_s = a_rsi * up + (1.0 - a_rsi) * up_s
+                dn_s = a_rsi * dn + (1.0 - a_rsi) * dn_s
+            if dn_s > 0.0:
+                r = 100.0 - 100.0 / (1.0 + up_s / dn_s)
+            elif up_s > 0.0:
+                r = 100.0
+            else:
+                r = 50.0
+
+            # ADX
+            tr = max(h - l, abs(h - pc), abs(l - pc))
+            hu = h - ph
+            ld = pl - l
+            p_dm = hu if (hu > ld and hu > 0.0) else 0.0
+            m_dm = ld if (ld > hu and ld > 0.0) else 0.0
+            tr_s = a_adx * tr + (1.0 - a_adx) * tr_s
+            p_dm_s = a_adx * p_dm + (1.0 - a_adx) * p_dm_s
+            m_dm_s = a_adx * m_dm + (1.0 - a_adx) * m_dm_s
+            if tr_s > 0.0:
+                p_di = 100.0 * p_dm_s / tr_s
+                m_di = 100.0 * m_dm_s / tr_s
+                if p_di + m_di > 0.0:
+                    dx = 100.0 * abs(p_di - m_di) / (p_di + m_di)
+                    adx_s = a_adx * dx + (1.0 - a_adx) * adx_s if adx_ok else dx
+                    adx_ok = True
+
+            out[_OUT_EMA, i] = ema_s
+            out[_OUT_RSI, i] = r
+            out[_OUT_MACD, i] = m
+            out[_OUT_SIG, i] = sig_s
+            out[_OUT_ADX, i] = adx_s
+            ph, pl, pc = h, l, c
+            nb += 1
+
+        st[_ST_N] = nb
+        st[_ST_EMA], st[_ST_FAST], st[_ST_SLOW], st[_ST_SIG] = ema_s, fast_s, slow_s, sig_s
+        st[_ST_UP], st[_ST_DN] = up_s, dn_s
+        st[_ST_TR], st[_ST_PDM], st[_ST_MDM], st[_ST_ADX] = tr_s, p_dm_s, m_dm_s, adx_s
+        st[_ST_ADX_OK] = 1.0 if adx_ok else 0.0
+        st[_ST_H], st[_ST_L], st[_ST_C] = ph, pl, pc
+
+# Buffere refolosite între apeluri (procesul --loop nu mai alocă la fiecare tick)
+_out_buf = np.empty((5, 4096))
+_live_state = _new_state()
+
+def indicator_buffer(n: int) -> np.ndarray:
+    """Buffer-ul de ieșire pentru n bare; crește doar dacă n depășește capacitatea."""
+    global _out_buf
+    if n > _out_buf.shape[1]:
+        _out_buf = np.empty((5, n))
+    return _out_buf
 
 # ============================================================
 #                    4. ALPACA CLIENT
@@ -90,18 +313,64 @@ def adx(high, low, close, length=14):
 class Alpaca:
     def __init__(self):
         if not ALPACA_API_KEY: raise RuntimeError("Lipsă API Key")
-        self.s = requests.Session()
+        self.s = http_session()
         self.s.headers.update({"APCA-API-KEY-ID": ALPACA_API_KEY, "APCA-API-SECRET-KEY": ALPACA_API_SECRET})
 
     def get_position(self, symbol):
-        r = self.s.get(f"{ALPACA_BASE_URL}/v2/positions/{symbol}")
+        r = self.s.get(POSITIONS_URL + symbol)
         return r.json() if r.status_code == 200 else None
 
     def close_position(self, symbol):
-        self.s.delete(f"{ALPACA_BASE_URL}/v2/positions/{symbol}")
+        self.s.delete(POSITIONS_URL + symbol)
 
     def submit_order(self, **kwargs):
-        self.s.post(f"{ALPACA_BASE_URL}/v2/orders", json=kwargs).raise_for_status()
+        self.s.post(ORDERS_URL, data=json_dumps(kwargs), headers=JSON_HEADERS).raise_for_status()
+
+    def get_bars(self, symbol, timeframe="15Min", limit=130, start=None) -> pd.DataFrame:
+        """
+        Bare OHLC din Alpaca Market Data (msgpack dacă e disponibil), index UTC.
+        Doar sesiunea regulată 09:30-16:00 ET, ca Yahoo cu prepost=False
+        (feed-ul IEX include și pre-market / after-hours).
+        Fără `start`: ultimele `limit` bare (130 = ~5 sesiuni) din ultimele 10 zile.
+        Cu `start`: toate barele de la acel moment încoace.
+        """
+        since = pd.Timestamp(start) if start is not None else \
+            pd.Timestamp.now(tz="UTC") - pd.Timedelta(days=10)
+        params = {"timeframe": timeframe, "feed": ALPACA_FEED, "adjustment": "raw",
+                  "start": since.isoformat(), "limit": 10000, "sort": "asc"}
+
+        bars = []
+        while True:
+            r = self.s.get(BARS_URL.format(symbol), params=params, headers=BARS_HEADERS, timeout=10)
+            r.raise_for_status()
+            if "msgpack" in r.headers.get("Content-Type", ""):
+                data = msgpack.unpackb(r.content, raw=False, timestamp=3)
+            else:
+                data = r.json()
+            bars.extend(data.get("bars") or [])
+            token = data.get("next_page_token")
+            if not token:
+                break
+            params["page_token"] = token
+
+        n = len(bars)
+        idx = pd.to_datetime([b["t"] for b in bars], utc=True)
+        et = idx.tz_convert("America/New_York")
+        minute = et.hour * 60 + et.minute
+        rth = np.asarray((minute >= 9 * 60 + 30) & (minute < 16 * 60))
+        cols = {name: np.fromiter((b[f] for b in bars), dtype=np.float64, count=n)[rth]
+                for name, f in (("Open", "o"), ("High", "h"), ("Low", "l"), ("Close", "c"))}
+        df = pd.DataFrame(cols, index=idx[rth])
+        return df if start is not None else df.iloc[-limit:]
+
+_alpaca: Optional[Alpaca] = None
+
+def get_alpaca() -> Alpaca:
+    """Clientul Alpaca e creat o singură dată și refolosit (conexiuni păstrate)."""
+    global _alpaca
+    if _alpaca is None:
+        _alpaca = Alpaca()
+    return _alpaca
 
 # ============================================================
 #                    5. LOGICA PRINCIPALĂ
@@ -111,80 +380,170 @@ class Alpaca:
 class Params:
     symbol: str = DEFAULT_SYMBOL
     qty: int = 250        
-    state_path: str = "./state.json"
+    state_path: str = "./state.txt"
+    ind_state_path: str = "./ind_state.txt"
     adx_thresh: float = 20.0 
 
-def get_yahoo_data(symbol, period="5d", interval="15m"):
+def _write_atomic(path: Path, text: str) -> None:
+    """Scriere atomică: fișier temporar + os.replace."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+def read_state(path: Path) -> dict:
     """
-    Descarcă date Yahoo și repară structura MultiIndex.
+    state.txt, text simplu (fără JSON), versionat în git:
+      linia 1: last_bar (bara pe care s-a tranzacționat ultima dată)
     """
     try:
-        df = yf.download(symbol, period=period, interval=interval, progress=False, auto_adjust=False)
-        
-        # 1. Aplatizare MultiIndex (Price, Ticker) -> (Price)
-        if isinstance(df.columns, pd.MultiIndex):
-            df.columns = df.columns.get_level_values(0)
-        
-        # 2. Redenumire coloane alternative
-        if 'Adj Close' in df.columns and 'Close' not in df.columns:
-            df['Close'] = df['Adj Close']
-            
-        # 3. Păstrare coloane esențiale
-        req = ['Open', 'High', 'Low', 'Close']
-        df = df[[c for c in req if c in df.columns]].copy()
+        lines = path.read_text().splitlines()
+    except FileNotFoundError:
+        return {}
+    return {"last_bar": lines[0]} if lines and lines[0] else {}
+
+def write_state(path: Path, state: dict) -> None:
+    _write_atomic(path, state.get("last_bar", "") + "\n")
+
+def read_ind_state(path: Path) -> dict:
+    """
+    ind_state.txt (nu e în git; workflow-ul îl păstrează cu actions/cache):
+      simbol sursă ts k0 ... k14 (starea indicatorilor după ultima bară închisă)
+    """
+    try:
+        f = path.read_text().split()
+    except FileNotFoundError:
+        return {}
+    if len(f) != 3 + _ST_LEN:
+        return {}
+    return {"symbol": f[0], "src": f[1], "ts": f[2], "k": [float(x) for x in f[3:]]}
+
+def write_ind_state(path: Path, ind: dict) -> None:
+    _write_atomic(path, " ".join([ind["symbol"], ind["src"], ind["ts"], *map(repr, ind["k"])]) + "\n")
+
+def get_yahoo_data(symbol, period="5d", interval="15m", start=None):
+    """
+    Descarcă date Yahoo prin Ticker.history (coloane pe un singur nivel).
+    Cu `start` se descarcă doar barele de la acel moment încoace.
+    """
+    try:
+        t = yf.Ticker(symbol)
+        if start is not None:
+            df = t.history(start=start, interval=interval, auto_adjust=False, prepost=False)
+        else:
+            df = t.history(period=period, interval=interval, auto_adjust=False, prepost=False)
+        df = df[['Open', 'High', 'Low', 'Close']]
+
+        # Index în UTC (comparăm cu timestamp-ul salvat în state)
+        if df.index.tz is None:
+            df.index = df.index.tz_localize("UTC")
+        else:
+            df.index = df.index.tz_convert("UTC")
         
         return df.dropna()
     except Exception as e:
         print(f"Yahoo Error: {e}")
         return pd.DataFrame()
 
+def get_data(alp: Alpaca, symbol, start=None) -> Tuple[pd.DataFrame, str]:
+    """
+    Sursa principală: barele Alpaca (IEX, aproape în timp real).
+    Dacă Alpaca Market Data nu răspunde sau întoarce prea puține bare
+    (niciuna la pornirea caldă, sub MIN_BARS la cea rece), revenim la Yahoo.
+    """
+    try:
+        df = alp.get_bars(symbol, timeframe="15Min", start=start)
+        if len(df) >= (1 if start is not None else MIN_BARS):
+            return df, "alpaca"
+        print(f"Alpaca Data: doar {len(df)} bare -> fallback Yahoo")
+    except Exception as e:
+        print(f"Alpaca Data Error: {e} -> fallback Yahoo")
+    if start is not None:
+        return get_yahoo_data(symbol, interval="15m", start=start), "yahoo"
+    return get_yahoo_data(symbol, period="5d", interval="15m"), "yahoo"
+
 def run_once(p: Params):
-    alp = Alpaca()
+    alp = get_alpaca()
     now_utc = dt.datetime.now(dt.timezone.utc)
     
+    state_file = Path(p.state_path)
+    state = read_state(state_file)
+    ind_file = Path(p.ind_state_path)
+
+    # 0. BARĂ DEJA PROCESATĂ? Dacă bara pe care am tranzacționat ultima dată
+    # e încă în formare, nu are rost nici să descărcăm date.
+    last_sym, _, last_bar_ts = state.get("last_bar", "").partition("_")
+    if last_sym == p.symbol and last_bar_ts and \
+            now_utc < pd.Timestamp(last_bar_ts) + dt.timedelta(minutes=BAR_MINUTES):
+        print(" -> Bară deja procesată. Aștept următoarea.")
+        return
+
     # 1. DESCĂRCARE DATE
-    df = get_yahoo_data(p.symbol, period="5d", interval="15m")
-    if df.empty or len(df) < 50: 
-        print(f"{p.symbol}: Date insuficiente Yahoo.")
+    # Pornire caldă: doar barele noi față de starea salvată a indicatorilor.
+    # Pornire la rece (sau dacă starea nu se potrivește): istoricul de 5 zile.
+    ind = read_ind_state(ind_file)
+    df = pd.DataFrame()
+    src = None
+    if ind.get("symbol") == p.symbol and len(ind.get("k", [])) == _ST_LEN:
+        since = pd.Timestamp(ind["ts"])
+        df, src = get_data(alp, p.symbol, start=since)
+        if src != ind.get("src"):
+            df = pd.DataFrame()  # Nu amestecăm barele din surse diferite
+        elif not df.empty:
+            df = df[df.index > since]
+        ind_state = np.array(ind["k"], dtype=np.float64)
+    if df.empty:
+        if src == "yahoo":
+            # Alpaca a eșuat deja la acest tick; nu mai reîncercăm (retry + timeout)
+            df = get_yahoo_data(p.symbol, period="5d", interval="15m")
+        else:
+            df, src = get_data(alp, p.symbol)
+        if df.empty or len(df) < MIN_BARS: 
+            print(f"{p.symbol}: Date insuficiente ({src}).")
+            return
+        ind_state = _new_state()
+
+    last_ts = df.index[-1] # Ultima lumânare disponibilă
+    bar_key = f"{p.symbol}_{last_ts}" # Folosim timpul lumânării ca ID
+    if state.get("last_bar") == bar_key: 
+        print(" -> Bară deja procesată. Aștept următoarea.")
         return
 
     # 2. CALCUL INDICATORI
-    df["EMA"] = ema(df["Close"], 50)
-    df["RSI"] = rsi(df["Close"])
-    df["MACD"], df["SIG"] = macd(df["Close"])
-    df["ADX"] = adx(df["High"], df["Low"], df["Close"])
+    # Barele închise intră în starea persistentă; ultima bară (poate fi încă
+    # în formare) se calculează pe o copie și se reia la rularea următoare.
+    o, h, l, c = (df[col].to_numpy(np.float64, copy=True) for col in ("Open", "High", "Low", "Close"))
+    out = indicator_buffer(len(df))
+    _indicators_fused(o[:-1], h[:-1], l[:-1], c[:-1], ind_state, out, 50, 14, 14)
+    if len(df) > 1:
+        write_ind_state(ind_file, {"symbol": p.symbol, "src": src, "ts": df.index[-2].isoformat(),
+                                   "k": ind_state.tolist()})
+    _live_state[:] = ind_state
+    _indicators_fused(o[-1:], h[-1:], l[-1:], c[-1:], _live_state, out, 50, 14, 14)
+    ema_v, rsi_v, macd_v, sig_v, adx_v = out[:, 0].tolist()
 
     # 3. VERIFICARE "PROSPEȚIME" DATE (LAG CHECK)
-    r = df.iloc[-1] # Ultima lumânare disponibilă
-    last_ts = df.index[-1]
-    
-    # Convertim timestamp-ul din Yahoo la UTC (dacă nu e deja)
-    if last_ts.tzinfo is None:
-        last_ts = last_ts.replace(tzinfo=dt.timezone.utc)
-    else:
-        last_ts = last_ts.astimezone(dt.timezone.utc)
-        
-    # Calculăm diferența în minute
+    # Calculăm diferența în minute (indexul e deja în UTC)
     lag_minutes = (now_utc - last_ts).total_seconds() / 60.0
     
-    print(f"📅 Ultima lumânare: {last_ts.strftime('%H:%M:%S UTC')}")
+    print(f"📅 Ultima lumânare: {last_ts.strftime('%H:%M:%S UTC')} ({src})")
     print(f"⏰ Ora curentă:     {now_utc.strftime('%H:%M:%S UTC')}")
     print(f"⚠️ Lag (Întârziere): {lag_minutes:.1f} minute")
 
-    # REGULĂ DE SIGURANȚĂ: Dacă datele sunt mai vechi de 20 minute, NU tranzacționăm
+    # REGULĂ DE SIGURANȚĂ (doar Yahoo): Dacă datele sunt mai vechi de 20 minute, NU tranzacționăm
     # (Yahoo are delay 15 min oficial, deci 20 e o marjă bună. Dacă e sub 20, e acceptabil)
-    if lag_minutes > 25:
+    # Feed-ul IEX Alpaca e aproape în timp real, deci verificarea nu se aplică acolo.
+    if src == "yahoo" and lag_minutes > 25:
         print(f"⛔ STOP: Datele sunt prea vechi (>25 min). Piața e închisă sau Yahoo are delay.")
         # Putem lăsa botul să ruleze doar pt debug, dar nu executăm ordine.
         # Uncomment linia de mai jos dacă vrei să blochezi execuția:
         # return 
 
-    price = float(r["Close"])
+    price = float(c[-1])
     
     # 4. STRATEGIA
-    trend_ok = r["ADX"] > p.adx_thresh
-    buy_signal = (price > r["EMA"]) and (r["MACD"] > r["SIG"]) and (r["RSI"] > 45) and trend_ok
-    sell_signal = (price < r["EMA"]) and (r["MACD"] < r["SIG"]) and (r["RSI"] < 55) and trend_ok
+    trend_ok = adx_v > p.adx_thresh
+    buy_signal = (price > ema_v) and (macd_v > sig_v) and (rsi_v > 45) and trend_ok
+    sell_signal = (price < ema_v) and (macd_v < sig_v) and (rsi_v < 55) and trend_ok
 
     # 5. POZIȚIE CURENTĂ
     pos = alp.get_position(p.symbol)
@@ -196,42 +555,56 @@ def run_once(p: Params):
     if buy_signal and not in_long: action = "LONG"
     elif sell_signal and not in_short: action = "SHORT"
     
-    # 6. MEMORIA BOTULUI
-    state_file = Path(p.state_path)
-    state = json.loads(state_file.read_text()) if state_file.exists() else {}
-    bar_key = f"{p.symbol}_{last_ts}" # Folosim timpul lumânării ca ID
-    
-    print(f"📊 {p.symbol} ${price:.2f} | ADX: {r['ADX']:.2f} | RSI: {r['RSI']:.1f} | Signal: {action}")
-
-    if state.get("last_bar") == bar_key: 
-        print(" -> Bară deja procesată. Aștept următoarea.")
-        return
+    print(f"📊 {p.symbol} ${price:.2f} | ADX: {adx_v:.2f} | RSI: {rsi_v:.1f} | Signal: {action}")
 
-    # 7. EXECUȚIA
+    # 6. EXECUȚIA
     if action != "HOLD":
         if pos: 
             alp.close_position(p.symbol)
-            tg_send(f"🔄 FLIP {p.symbol} la ${price:.2f}")
+            tg_notify(f"🔄 FLIP {p.symbol} la ${price:.2f}")
             time.sleep(2)
 
         side = "buy" if action == "LONG" else "sell"
         try:
             alp.submit_order(symbol=p.symbol, qty=p.qty, side=side, type="market", time_in_force="day")
-            tg_send(f"🚀 OPEN {action} {p.symbol}\nQty: {p.qty} @ ${price:.2f}\nADX: {r['ADX']:.2f}")
+            tg_notify(f"🚀 OPEN {action} {p.symbol}\nQty: {p.qty} @ ${price:.2f}\nADX: {adx_v:.2f}")
             state["last_bar"] = bar_key
-            state_file.write_text(json.dumps(state))
+            write_state(state_file, state)
         except Exception as e:
             print(f"Order Error: {e}")
-            tg_send(f"❌ EROARE: {e}")
+            tg_notify(f"❌ EROARE: {e}")
+
+def seconds_to_next_bar(delay: float = 5.0) -> float:
+    """Secunde până la următoarea graniță de bară (+ `delay` ca datele să apară)."""
+    step = BAR_MINUTES * 60
+    return step - time.time() % step + delay
+
+def run_forever(p: Params) -> None:
+    """
+    Proces de lungă durată: importurile, kernel-urile Numba și sesiunile HTTP
+    rămân calde între tick-uri; dormim până la următoarea bară (fără drift).
+    """
+    while True:
+        try:
+            run_once(p)
+        except Exception as e:
+            print(f"Run Error: {e}")
+        time.sleep(seconds_to_next_bar())
 
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--symbol", default=DEFAULT_SYMBOL)
     ap.add_argument("--qty", type=int, default=250)
-    ap.add_argument("--state", default="./state.json")
+    ap.add_argument("--state", default="./state.txt")
+    ap.add_argument("--ind-state", default="./ind_state.txt")
+    ap.add_argument("--loop", action="store_true", help="rulează continuu, câte un tick la fiecare bară")
     args = ap.parse_args()
 
-    run_once(Params(symbol=args.symbol, qty=args.qty, state_path=args.state))
+    p = Params(symbol=args.symbol, qty=args.qty, state_path=args.state, ind_state_path=args.ind_state)
+    if args.loop:
+        run_forever(p)
+    else:
+        run_once(p)
 
 if __name__ == "__main__":
     main()